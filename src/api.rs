@@ -23,14 +23,19 @@ pub struct Project {
     pub clone_token: String,
 }
 
-#[derive(Debug, Serialize)]
-pub struct CreateProjectRequest {
+#[derive(Debug, Deserialize)]
+pub struct ProjectSummary {
     pub name: String,
 }
 
+#[derive(Debug, Serialize)]
+pub struct CreateProjectRequest<'a> {
+    pub name: &'a str,
+}
+
 #[derive(Debug, Deserialize)]
-pub struct ListProjectsResponse {
-    pub projects: Vec<Project>,
+pub struct ListProjectsResponse<P = Project> {
+    pub projects: Vec<P>,
 }
 
 #[derive(Debug, Serialize, Deserialize)]
@@ -1,15 +1,19 @@
 use anyhow::{anyhow, Result};
+use base64::prelude::{Engine as _, BASE64_STANDARD};
 use clap::Parser as _;
-use futures::{StreamExt as _, TryStreamExt};
+use futures::{FutureExt as _, StreamExt as _, TryStreamExt};
 use log::debug;
+use reqwest::header::{HeaderMap, HeaderValue, AUTHORIZATION};
 use reqwest_eventsource::EventSource;
+use serde::de::IgnoredAny;
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
+use std::io::Write as _;
 use std::path::{Path, PathBuf};
 use std::pin::Pin;
-use std::process::Command;
 use tokio::fs::File;
-use tokio::io::{AsyncReadExt as _, AsyncWriteExt as _};
+use tokio::io::BufWriter;
+use tokio::process::Command;
 use tokio_util::io::StreamReader;
 use url::Url;
 
@@ -31,13 +35,20 @@ struct APIClient {
 
 impl APIClient {
     fn new(api_url: &Url, token: &str) -> Result<Self> {
-        let mut base_url = api_url.clone();
-        base_url.set_password(Some(token)).unwrap();
+        // Set by hand instead of via URL credentials so it's only encoded once
+        let mut auth = HeaderValue::from_str(&format!(
+            "Basic {}",
+            BASE64_STANDARD.encode(format!(":{}", token))
+        ))?;
+        auth.set_sensitive(true);
+        let mut headers = HeaderMap::new();
+        headers.insert(AUTHORIZATION, auth);
         Ok(Self {
             client: reqwest::ClientBuilder::new()
                 .user_agent("bismuthcloud-cli")
+                .default_headers(headers)
                 .build()?,
-            base_url,
+            base_url: api_url.clone(),
         })
     }
     fn get(&self, path: &str) -> reqwest::RequestBuilder {
@@ -74,8 +85,34 @@ impl ResponseErrorExt for reqwest::Response {
     }
 }
 
+async fn write_body(
+    resp: reqwest::Response,
+    output: impl tokio::io::AsyncWrite + Unpin,
+) -> Result<()> {
+    let mut output = BufWriter::new(output);
+    tokio::io::copy(
+        &mut StreamReader::new(
+            resp.bytes_stream()
+                .map_err(|e| std::io::Error::new(std::io::ErrorKind::Other, e)),
+        ),
+        &mut output,
+    )
+    .await?;
+    Ok(())
+}
+
+/// Print each item on its own line to stdout
+fn print_lines(lines: impl IntoIterator<Item = impl std::fmt::Display>) -> Result<()> {
+    let mut stdout = std::io::BufWriter::new(std::io::stdout().lock());
+    for line in lines {
+        writeln!(stdout, "{}", line)?;
+    }
+    stdout.flush()?;
+    Ok(())
+}
+
 async fn resolve_project_id(client: &APIClient, id: &IdOrName) -> Result<api::Project> {
-    let project_id = match id {
+    match id {
         cli::IdOrName::Name(name) => {
             let get_projects = client
                 .get("/projects/list")
@@ -84,73 +121,57 @@ async fn resolve_project_id(client: &APIClient, id: &IdOrName) -> Result<api::Pr
                 .error_body_for_status()
                 .await?;
             let projects: api::ListProjectsResponse = get_projects.json().await?;
-            let project = projects
+            projects
                 .projects
-                .iter()
+                .into_iter()
                 .find(|p| p.name == *name)
-                .ok_or_else(|| anyhow!("No such project"))?;
-            project.id
+                .ok_or_else(|| anyhow!("No such project"))
         }
-        cli::IdOrName::Id(id) => *id,
-    };
-    let get_project = client
-        .get(&format!("projects/{}", project_id))
-        .send()
-        .await?
-        .error_body_for_status()
-        .await?;
-    Ok(get_project.json().await?)
+        cli::IdOrName::Id(id) => {
+            let get_project = client
+                .get(&format!("projects/{}", id))
+                .send()
+                .await?
+                .error_body_for_status()
+                .await?;
+            Ok(get_project.json().await?)
+        }
+    }
 }
 
-async fn resolve_feature_id(
-    client: &APIClient,
-    project: &api::Project,
+fn resolve_feature_id<'a>(
+    project: &'a api::Project,
     feature: &IdOrName,
-) -> Result<api::Feature> {
-    let feature_id = match feature {
-        cli::IdOrName::Name(name) => {
-            let feature = project
-                .features
-                .iter()
-                .find(|f| f.name == *name)
-                .ok_or_else(|| anyhow!("No such feature"))?;
-            feature.id
-        }
-        cli::IdOrName::Id(id) => *id,
-    };
-    let get_feature = client
-        .get(&format!("/projects/{}/features/{}", project.id, feature_id))
-        .send()
-        .await?
-        .error_body_for_status()
-        .await?;
-    Ok(get_feature.json().await?)
+) -> Result<&'a api::Feature> {
+    match feature {
+        cli::IdOrName::Name(name) => project.features.iter().find(|f| f.name == *name),
+        cli::IdOrName::Id(id) => project.features.iter().find(|f| f.id == *id),
+    }
+    .ok_or_else(|| anyhow!("No such feature"))
 }
 
-fn project_clone(project: &api::Project, api_url: &Url, outdir: Option<&Path>) -> Result<PathBuf> {
+async fn project_clone(
+    project: &api::Project,
+    api_url: &Url,
+    outdir: Option<&Path>,
+) -> Result<PathBuf> {
     let mut auth_url = api_url.clone();
     auth_url.set_password(Some(&project.clone_token)).unwrap();
 
-    let outdir = outdir
-        .map(|p| p.to_owned())
-        .unwrap_or(PathBuf::from(&project.name));
+    let outdir = outdir.map_or_else(|| PathBuf::from(&project.name), Path::to_path_buf);
     debug!("Cloning project to {:?}", outdir);
 
-    dbg!(auth_url
-        .join(&format!("/git/{}", project.hash))?
-        .to_string());
+    let clone_url = auth_url.join(&format!("/git/{}", project.hash))?;
 
-    Command::new("git")
+    let status = Command::new("git")
         .arg("clone")
-        .arg(
-            auth_url
-                .join(&format!("/git/{}", project.hash))?
-                .to_string(),
-        )
+        .arg(clone_url.as_str())
         .arg(&outdir)
-        .stdout(std::process::Stdio::inherit())
-        .stderr(std::process::Stdio::inherit())
-        .output()?;
+        .status()
+        .await?;
+    if !status.success() {
+        return Err(anyhow!("git clone failed ({})", status));
+    }
 
     Ok(outdir)
 }
@@ -164,17 +185,30 @@ async fn feature_logs(
     let mut es = EventSource::new(client.get(&format!(
         "/projects/{}/features/{}/logs",
         project.id, feature.id
-    )))?;
-
-    while let Some(event) = es.next().await {
-        match event {
-            Ok(reqwest_eventsource::Event::Open) => {}
-            Ok(reqwest_eventsource::Event::Message(message)) => print!("{}", message.data),
-            Err(err) => {
-                eprintln!("Error streaming logs: {}", err);
-                es.close();
+    )))?
+    .fuse();
+
+    let mut stdout = std::io::BufWriter::new(std::io::stdout());
+    while let Some(mut event) = es.next().await {
+        loop {
+            match event {
+                Ok(reqwest_eventsource::Event::Open) => {}
+                Ok(reqwest_eventsource::Event::Message(message)) => {
+                    stdout.write_all(message.data.as_bytes())?
+                }
+                Err(err) => {
+                    stdout.flush()?;
+                    eprintln!("Error streaming logs: {}", err);
+                    es.get_mut().close();
+                    break;
+                }
+            }
+            match es.next().now_or_never() {
+                Some(Some(next)) => event = next,
+                _ => break,
             }
         }
+        stdout.flush()?;
     }
     Ok(())
 }
@@ -190,7 +224,11 @@ fn token_server() -> Result<String> {
         .incoming_requests()
         .next()
         .ok_or_else(|| anyhow!("No request"))?;
-    let token = request.url().split("?token=").last().unwrap().to_string();
+    let url = request.url();
+    let token = url
+        .rsplit_once("?token=")
+        .map_or(url, |(_, token)| token)
+        .to_string();
     request.respond(
         tiny_http::Response::from_string(
             "<html><body>Authentication successful. You may now close this window</body></html>",
@@ -204,7 +242,8 @@ fn token_server() -> Result<String> {
     Ok(token)
 }
 
-#[tokio::main]
+// Single-threaded runtime: blocking work must go through spawn_blocking
+#[tokio::main(flavor = "current_thread")]
 async fn main() -> Result<()> {
     let args = Cli::parse();
     env_logger::Builder::new()
@@ -226,17 +265,22 @@ async fn main() -> Result<()> {
         }
 
         print!("> ");
-        let mut org_selector = String::new();
-        std::io::stdin().read_line(&mut org_selector)?;
-        let organization = if let Ok(org_idx) = org_selector.trim().parse::<usize>() {
-            if org_idx > organizations.len() {
-                return Err(anyhow!("Invalid organization index"));
-            }
-            &organizations[org_idx - 1]
+        std::io::stdout().flush()?;
+        let org_selector = tokio::task::spawn_blocking(|| {
+            let mut line = String::new();
+            std::io::stdin().read_line(&mut line).map(|_| line)
+        })
+        .await??;
+        let org_selector = org_selector.trim();
+        let organization = if let Ok(org_idx) = org_selector.parse::<usize>() {
+            org_idx
+                .checked_sub(1)
+                .and_then(|i| organizations.get(i))
+                .ok_or_else(|| anyhow!("Invalid organization index"))?
         } else {
             organizations
                 .iter()
-                .find(|org| org.name == org_selector.trim())
+                .find(|org| org.name == org_selector)
                 .ok_or_else(|| anyhow!("No such organization"))?
         };
 
@@ -244,18 +288,16 @@ async fn main() -> Result<()> {
             token: token.to_string(),
             organization_id: organization.id,
         };
-        let config_str = serde_json::to_string(&config)?;
-        let mut config_file = File::create(&args.global.config_file).await?;
-        config_file.write_all(config_str.as_bytes()).await?;
+        tokio::fs::write(&args.global.config_file, serde_json::to_vec(&config)?).await?;
         return Ok(());
     }
 
-    let mut config_file = File::open(&args.global.config_file).await.map_err(|_| {
-        anyhow!("Failed to open auth token. Maybe you need to `bismuth login` first?")
-    })?;
-    let mut config_str: String = String::new();
-    config_file.read_to_string(&mut config_str).await?;
-    let config: Config = serde_json::from_str(&config_str)?;
+    let config_bytes = tokio::fs::read(&args.global.config_file)
+        .await
+        .map_err(|_| {
+            anyhow!("Failed to open auth token. Maybe you need to `bismuth login` first?")
+        })?;
+    let config: Config = serde_json::from_slice(&config_bytes)?;
 
     debug!("Organization ID: {}", config.organization_id);
 
@@ -267,7 +309,7 @@ async fn main() -> Result<()> {
         &config.token,
     )?;
 
-    match &args.command {
+    match args.command {
         cli::Command::Project { command } => match command {
             cli::ProjectCommand::List => {
                 let get_projects = client
@@ -276,16 +318,14 @@ async fn main() -> Result<()> {
                     .await?
                     .error_body_for_status()
                     .await?;
-                let projects: api::ListProjectsResponse = get_projects.json().await?;
-                for project in &projects.projects {
-                    println!("{}", project.name);
-                }
-                Ok(())
+                let projects: api::ListProjectsResponse<api::ProjectSummary> =
+                    get_projects.json().await?;
+                print_lines(projects.projects.iter().map(|p| &p.name))
             }
             cli::ProjectCommand::Create { name } => {
                 client
                     .post("/projects/upsert")
-                    .json(&api::CreateProjectRequest { name: name.clone() })
+                    .json(&api::CreateProjectRequest { name: &name })
                     .send()
                     .await?
                     .error_body_for_status()
@@ -293,26 +333,23 @@ async fn main() -> Result<()> {
                 Ok(())
             }
             cli::ProjectCommand::Clone { project, outdir } => {
-                let project = resolve_project_id(&client, project).await?;
-                project_clone(&project, &args.global.api_url, outdir.as_deref())?;
+                let project = resolve_project_id(&client, &project).await?;
+                project_clone(&project, &args.global.api_url, outdir.as_deref()).await?;
                 Ok(())
             }
         },
         cli::Command::Feature { command } => match command {
             cli::FeatureCommand::List { project } => {
-                let project = resolve_project_id(&client, project).await?;
-                for feature in &project.features {
-                    println!("{}", feature.name);
-                }
-                Ok(())
+                let project = resolve_project_id(&client, &project).await?;
+                print_lines(project.features.iter().map(|f| &f.name))
             }
             cli::FeatureCommand::Config {
                 project,
                 feature,
                 command,
             } => {
-                let project = resolve_project_id(&client, project).await?;
-                let feature = resolve_feature_id(&client, &project, feature).await?;
+                let project = resolve_project_id(&client, &project).await?;
+                let feature = resolve_feature_id(&project, &feature)?;
 
                 match command {
                     cli::FeatureConfigCommand::Get { key } => {
@@ -330,14 +367,16 @@ async fn main() -> Result<()> {
                             Some(key) => {
                                 let config = feature_config
                                     .iter()
-                                    .find(|c| c.key == *key)
+                                    .find(|c| c.key == key)
                                     .ok_or_else(|| anyhow!("No such key"))?;
                                 println!("{}", config.value);
                             }
                             None => {
-                                for c in feature_config {
-                                    println!("{}={}", c.key, c.value);
-                                }
+                                print_lines(
+                                    feature_config
+                                        .iter()
+                                        .map(|c| format!("{}={}", c.key, c.value)),
+                                )?;
                             }
                         }
                         Ok(())
@@ -353,11 +392,28 @@ async fn main() -> Result<()> {
                             .error_body_for_status()
                             .await?;
                         let mut feature_config: Vec<api::FeatureConfig> = resp.json().await?;
-                        feature_config.retain(|c| c.key != *key);
-                        feature_config.push(api::FeatureConfig {
-                            key: key.clone(),
-                            value: value.clone(),
+                        let mut matches = feature_config.iter().filter(|c| c.key == key);
+                        // Already set to this value, nothing to send
+                        if matches.next().is_some_and(|c| c.value == value)
+                            && matches.next().is_none()
+                        {
+                            return Ok(());
+                        }
+                        let mut found = false;
+                        feature_config.retain_mut(|c| {
+                            if c.key != key {
+                                return true;
+                            }
+                            if found {
+                                return false;
+                            }
+                            found = true;
+                            c.value.clone_from(&value);
+                            true
                         });
+                        if !found {
+                            feature_config.push(api::FeatureConfig { key, value });
+                        }
                         client
                             .post(&format!(
                                 "/projects/{}/features/{}/config",
@@ -373,8 +429,8 @@ async fn main() -> Result<()> {
                 }
             }
             cli::FeatureCommand::Deploy { project, feature } => {
-                let project = resolve_project_id(&client, project).await?;
-                let feature = resolve_feature_id(&client, &project, feature).await?;
+                let project = resolve_project_id(&client, &project).await?;
+                let feature = resolve_feature_id(&project, &feature)?;
 
                 client
                     .post(&format!(
@@ -388,8 +444,8 @@ async fn main() -> Result<()> {
                 Ok(())
             }
             cli::FeatureCommand::GetInvokeURL { project, feature } => {
-                let project = resolve_project_id(&client, project).await?;
-                let feature = resolve_feature_id(&client, &project, feature).await?;
+                let project = resolve_project_id(&client, &project).await?;
+                let feature = resolve_feature_id(&project, &feature)?;
 
                 let resp = client
                     .get(&format!(
@@ -408,10 +464,10 @@ async fn main() -> Result<()> {
                 feature,
                 follow,
             } => {
-                let project = resolve_project_id(&client, project).await?;
-                let feature = resolve_feature_id(&client, &project, feature).await?;
+                let project = resolve_project_id(&client, &project).await?;
+                let feature = resolve_feature_id(&project, &feature)?;
 
-                feature_logs(&project, &feature, *follow, &client).await
+                feature_logs(&project, feature, follow, &client).await
             }
         },
         cli::Command::KV {
@@ -419,8 +475,8 @@ async fn main() -> Result<()> {
             feature,
             command,
         } => {
-            let project = resolve_project_id(&client, project).await?;
-            let feature = resolve_feature_id(&client, &project, feature).await?;
+            let project = resolve_project_id(&client, &project).await?;
+            let feature = resolve_feature_id(&project, &feature)?;
             match command {
                 cli::KVCommand::Get { key } => {
                     let resp = client
@@ -432,15 +488,7 @@ async fn main() -> Result<()> {
                         .await?
                         .error_body_for_status()
                         .await?;
-                    tokio::io::copy(
-                        &mut StreamReader::new(
-                            resp.bytes_stream()
-                                .map_err(|e| std::io::Error::new(std::io::ErrorKind::Other, e)),
-                        ),
-                        &mut tokio::io::stdout(),
-                    )
-                    .await?;
-                    Ok(())
+                    write_body(resp, tokio::io::stdout()).await
                 }
                 cli::KVCommand::Set { key, value } => {
                     client
@@ -448,7 +496,7 @@ async fn main() -> Result<()> {
                             "/projects/{}/features/{}/svcprovider/kv/v1/{}",
                             project.id, feature.id, key
                         ))
-                        .body(value.clone())
+                        .body(value)
                         .send()
                         .await?
                         .error_body_for_status()
@@ -474,8 +522,8 @@ async fn main() -> Result<()> {
             feature,
             command,
         } => {
-            let project = resolve_project_id(&client, project).await?;
-            let feature = resolve_feature_id(&client, &project, feature).await?;
+            let project = resolve_project_id(&client, &project).await?;
+            let feature = resolve_feature_id(&project, &feature)?;
             match command {
                 cli::BlobCommand::List => {
                     let resp = client
@@ -485,11 +533,8 @@ async fn main() -> Result<()> {
                         ))
                         .send()
                         .await?;
-                    let blobs: HashMap<String, Vec<u8>> = resp.json().await?;
-                    for blob in blobs.keys() {
-                        println!("{}", blob);
-                    }
-                    Ok(())
+                    let blobs: HashMap<String, IgnoredAny> = resp.json().await?;
+                    print_lines(blobs.keys())
                 }
                 cli::BlobCommand::Create { key, value } => {
                     client
@@ -497,8 +542,8 @@ async fn main() -> Result<()> {
                             "/projects/{}/features/{}/svcprovider/blob/v1/{}",
                             project.id, feature.id, key
                         ))
-                        .body(if let Some(literal) = &value.literal {
-                            reqwest::Body::from(literal.clone())
+                        .body(if let Some(literal) = value.literal {
+                            reqwest::Body::from(literal)
                         } else {
                             reqwest::Body::from(File::open(value.file.as_ref().unwrap()).await?)
                         })
@@ -518,19 +563,11 @@ async fn main() -> Result<()> {
                         .await?
                         .error_body_for_status()
                         .await?;
-                    let mut output: Pin<Box<dyn tokio::io::AsyncWrite>> = match output {
+                    let output: Pin<Box<dyn tokio::io::AsyncWrite>> = match output {
                         Some(output) => Box::pin(File::create(output).await?),
                         None => Box::pin(tokio::io::stdout()),
                     };
-                    tokio::io::copy(
-                        &mut StreamReader::new(
-                            resp.bytes_stream()
-                                .map_err(|e| std::io::Error::new(std::io::ErrorKind::Other, e)),
-                        ),
-                        &mut output,
-                    )
-                    .await?;
-                    Ok(())
+                    write_body(resp, output).await
                 }
                 cli::BlobCommand::Set { key, value } => {
                     client
@@ -538,8 +575,8 @@ async fn main() -> Result<()> {
                             "/projects/{}/features/{}/svcprovider/blob/v1/{}",
                             project.id, feature.id, key
                         ))
-                        .body(if let Some(literal) = &value.literal {
-                            reqwest::Body::from(literal.clone())
+                        .body(if let Some(literal) = value.literal {
+                            reqwest::Body::from(literal)
                         } else {
                             reqwest::Body::from(File::open(value.file.as_ref().unwrap()).await?)
                         })